@@ -3,13 +3,21 @@ Aerodrome Finance integration for Base network swaps.
 Aerodrome is the primary DEX on Base with deep liquidity.
 """
 
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from eth_abi import decode as abi_decode
+from eth_abi.exceptions import DecodingError
+from hexbytes import HexBytes
 from web3 import Web3
 from web3.contract import Contract
-from web3.exceptions import ContractLogicError
+from web3.exceptions import (
+    BadFunctionCallOutput,
+    ContractLogicError,
+    Web3RPCError,
+)
 
 from .config import AERODROME_ROUTER_ADDRESS
-from .web3_utils import to_checksum
+from .web3_utils import estimate_gas_limit, multicall3_aggregate, to_checksum
 
 
 # Aerodrome Router ABI (simplified, includes main swap functions)
@@ -65,11 +73,22 @@ AERODROME_FACTORY_CL = (
     "0x5e7BB104d84c7CB9B682AaC2F3d509f5F406809A"  # Concentrated Liquidity pools
 )
 
+# Gas limit used when the swap cannot be estimated.
+AERODROME_SWAP_GAS_LIMIT = 400_000
+
 
 def get_aerodrome_router(w3: Web3) -> Contract:
-    """Get Aerodrome router contract instance"""
-    router_address = to_checksum(w3, AERODROME_ROUTER_ADDRESS)
-    return w3.eth.contract(address=router_address, abi=AERODROME_ROUTER_ABI)
+    """Get Aerodrome router contract instance (built once per Web3 instance)"""
+    router = getattr(w3, "_fundis_aerodrome_router", None)
+    if router is None:
+        router = w3.eth.contract(
+            address=AERODROME_ROUTER_ADDRESS, abi=AERODROME_ROUTER_ABI
+        )
+        try:
+            w3._fundis_aerodrome_router = router  # type: ignore[attr-defined]
+        except Exception:  # noqa: BLE001
+            pass
+    return router
 
 
 def try_aerodrome_swap_simulation(
@@ -77,7 +96,8 @@ def try_aerodrome_swap_simulation(
 ) -> Optional[Tuple[int, list]]:
     """
     Try to simulate a swap on Aerodrome.
-    Returns (output_amount, route) if successful, None otherwise.
+    Returns (output_amount, route) for the route with the best quote if any
+    route has liquidity, None otherwise.
     """
     router = get_aerodrome_router(w3)
     token_in = to_checksum(w3, token_in)
@@ -103,15 +123,50 @@ def try_aerodrome_swap_simulation(
         ),  # Concentrated liquidity
     ]
 
-    for routes, route_desc in route_configs:
+    candidates = [
+        [
+            {"from": r[0], "to": r[1], "stable": r[2], "factory": r[3]}
+            for r in routes
+        ]
+        for routes, _route_desc in route_configs
+    ]
+
+    # Quote every route in one Multicall3 eth_call (failures allowed, e.g. a
+    # pool that does not exist) and keep the best output. Only fall back to
+    # per-route calls when the multicall itself is unavailable or reverts;
+    # transport errors (429, timeouts) propagate rather than tripling the load.
+    calls = [
+        (
+            router.address,
+            HexBytes(router.encode_abi("getAmountsOut", args=[amount_in, routes])),
+        )
+        for routes in candidates
+    ]
+    try:
+        results = multicall3_aggregate(w3, calls)
+    except (ContractLogicError, BadFunctionCallOutput, Web3RPCError, DecodingError):
+        return _simulate_routes_sequentially(router, amount_in, candidates)
+
+    best: Optional[Tuple[int, list]] = None
+    for formatted_routes, (success, data) in zip(candidates, results):
+        if not success:
+            continue
         try:
-            # Format routes for the contract call
-            formatted_routes = [
-                {"from": r[0], "to": r[1], "stable": r[2], "factory": r[3]}
-                for r in routes
-            ]
+            (amounts,) = abi_decode(["uint256[]"], data)
+        except Exception:  # noqa: BLE001
+            continue
+        if amounts and amounts[-1] > 0:  # Last element is final output
+            if best is None or amounts[-1] > best[0]:
+                best = (amounts[-1], formatted_routes)
+    return best
 
-            # Try to get output amounts
+
+def _simulate_routes_sequentially(
+    router: Contract, amount_in: int, candidates: List[list]
+) -> Optional[Tuple[int, list]]:
+    """Fallback for endpoints where the multicall quote fails: one call per route."""
+    for formatted_routes in candidates:
+        try:
             amounts = router.functions.getAmountsOut(amount_in, formatted_routes).call()
 
             if amounts and len(amounts) > 0:
@@ -136,21 +191,25 @@ def build_aerodrome_swap_tx(
     routes: list,
     deadline: int,
     nonce: int,
-    gas_price: int,
+    fee_params: Dict[str, int],
     chain_id: int,
 ) -> dict:
-    """Build Aerodrome swap transaction"""
+    """Build Aerodrome swap transaction (fee_params: EIP-1559 fee fields)"""
     router = get_aerodrome_router(w3)
     wallet = to_checksum(w3, wallet)
 
-    return router.functions.swapExactTokensForTokens(
+    # Passing a gas limit stops build_transaction from estimating on its own;
+    # the estimate below adds headroom and tolerates estimation failures.
+    tx = router.functions.swapExactTokensForTokens(
         amount_in, amount_out_min, routes, wallet, deadline
     ).build_transaction(
         {
             "from": wallet,
             "nonce": nonce,
-            "gas": 400_000,
-            "gasPrice": gas_price,
+            "gas": AERODROME_SWAP_GAS_LIMIT,
             "chainId": chain_id,
+            **fee_params,
         }
     )
+    tx["gas"] = estimate_gas_limit(w3, tx, AERODROME_SWAP_GAS_LIMIT)
+    return tx
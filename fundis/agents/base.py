@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable
+from typing import Any, Callable, Dict, Optional
 
+from eth_account import Account
+from eth_account.datastructures import SignedTransaction
+from eth_account.signers.local import LocalAccount
 from web3 import Web3
 
 from ..memory import MemoryService
@@ -23,6 +26,8 @@ class AgentContext:
     - ctx.memory: MemoryService instance for logging and positions
     - ctx.print: function to print messages back to the CLI
     - ctx.chain_id: EVM chain id (Base mainnet by default)
+    - ctx.account: LocalAccount for the wallet (derived from private_key on
+      first use if not provided)
     """
 
     web3: Web3
@@ -31,3 +36,10 @@ class AgentContext:
     memory: MemoryService
     print: PrintFn
     chain_id: int
+    account: Optional[LocalAccount] = None
+
+    def sign_transaction(self, tx: Dict[str, Any]) -> SignedTransaction:
+        """Sign `tx` with the wallet key, deriving the account only once."""
+        if self.account is None:
+            self.account = Account.from_key(self.private_key)
+        return self.account.sign_transaction(tx)
@@ -3,26 +3,42 @@ from __future__ import annotations
 import json
 import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from requests import HTTPError
 from web3 import Web3
-from web3.exceptions import ContractLogicError
-
-from ..config import (
-    AERODROME_ROUTER_ADDRESS,
-    USDC_ADDRESS,
+from web3.exceptions import (
+    BadResponseFormat,
+    ContractLogicError,
+    TimeExhausted,
+    Web3RPCError,
 )
+from web3.types import TxParams
+
+from ..aerodrome import build_aerodrome_swap_tx, try_aerodrome_swap_simulation
+from ..auth import load_auth_config
+from ..config import AERODROME_ROUTER_ADDRESS, USDC_ADDRESS
 from ..memory import MemoryService, Position
 from ..web3_utils import (
-    ERC20_MINIMAL_ABI,
+    FEE_HISTORY_BLOCKS,
+    RECEIPT_POLL_LATENCY_SECONDS,
+    RECEIPT_TIMEOUT_SECONDS,
+    decimal_scale,
+    decode_uint256,
+    eip1559_fee_params,
+    encode_erc20_approve,
+    estimate_gas_limit,
+    erc20_allowance_calldata,
     get_erc20_balance,
+    get_erc20_balances,
     get_web3,
     to_checksum,
+    to_human_amount,
 )
 from .base import AgentContext
 
@@ -32,6 +48,19 @@ SENTICHAIN_ENDPOINT = (
     "?ticker={ticker}&summary_type=l3_event_sentiment_reasoning&api_key={api_key}"
 )
 
+# Gas limit used when an approve transaction cannot be estimated.
+APPROVE_GAS_LIMIT = 200_000
+
+# Keep-alive session for the SentiChain API, so repeated fetches (e.g. the
+# BTC and ETH agents in one process) reuse the TLS connection.
+_SENTICHAIN_SESSION = requests.Session()
+# url -> (ETag, payload) of the last 200 response, so unchanged results come
+# back as an empty 304 instead of the full JSON body.
+_SENTICHAIN_ETAG_CACHE: Dict[str, Tuple[str, dict]] = {}
+
+# Runs independent RPC reads concurrently when the provider rejects batches.
+_RPC_EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="fundis-rpc")
+
 
 @dataclass
 class SentimentEvent:
@@ -78,12 +107,22 @@ def _parse_reasoning_payload(payload: dict) -> List[SentimentEvent]:
 
 
 def fetch_sentichain_events(
-    ticker: str, api_key: str, timeout: float = 10.0
+    ticker: str,
+    api_key: str,
+    timeout: float = 10.0,
+    session: Optional[requests.Session] = None,
 ) -> List[SentimentEvent]:
     url = SENTICHAIN_ENDPOINT.format(ticker=ticker, api_key=api_key)
-    resp = requests.get(url, timeout=timeout)
+    cached = _SENTICHAIN_ETAG_CACHE.get(url)
+    headers = {"If-None-Match": cached[0]} if cached else None
+    resp = (session or _SENTICHAIN_SESSION).get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and cached:
+        return _parse_reasoning_payload(cached[1])
     resp.raise_for_status()
     payload = resp.json()
+    etag = resp.headers.get("ETag")
+    if etag:
+        _SENTICHAIN_ETAG_CACHE[url] = (etag, payload)
     return _parse_reasoning_payload(payload)
 
 
@@ -93,9 +132,13 @@ def _pretty_print_events(
     if not events:
         ctx.print("No sentiment events available.")
         return
-    ctx.print(f"--- {agent_name} latest sentiment events ({len(events)}) ---")
-    for e in events:
-        ctx.print(f"{e.timestamp} | [{e.event}] sentiment={e.sentiment} :: {e.summary}")
+    # One ctx.print for the whole block: a single write instead of one per event.
+    lines = [f"--- {agent_name} latest sentiment events ({len(events)}) ---"]
+    lines.extend(
+        f"{e.timestamp} | [{e.event}] sentiment={e.sentiment} :: {e.summary}"
+        for e in events
+    )
+    ctx.print("\n".join(lines))
 
 
 def _sentiment_counts(events: List[SentimentEvent]) -> Counter:
@@ -144,7 +187,9 @@ def _ensure_allocation(
         return None
 
     needed = Decimal("10")
-    if human < needed:
+    # Compare in raw token units: exact integers, no Decimal division involved.
+    allocated_amount_raw = int(needed * decimal_scale(info.decimals))
+    if raw < allocated_amount_raw:
         msg = (
             f"Insufficient USDC balance for allocation: have {human} {info.symbol}, "
             f"need at least {needed} {info.symbol}. Skipping run."
@@ -154,7 +199,6 @@ def _ensure_allocation(
         return None
 
     allocated_amount = float(needed)
-    allocated_amount_raw = int(needed * Decimal(10**info.decimals))
 
     pos = Position(
         wallet_address=wallet,
@@ -167,12 +211,13 @@ def _ensure_allocation(
         current_position="USDC",
         last_updated_at=datetime.now(timezone.utc).isoformat(),
     )
-    memory.upsert_position(pos)
-    memory.log(
-        f"Allocated {allocated_amount} USDC for agent {agent_name}.",
-        wallet_address=wallet,
-        agent_name=agent_name,
-    )
+    with memory.batch():
+        memory.upsert_position(pos)
+        memory.log(
+            f"Allocated {allocated_amount} USDC for agent {agent_name}.",
+            wallet_address=wallet,
+            agent_name=agent_name,
+        )
     ctx.print(
         f"Allocated {allocated_amount} USDC for this agent. "
         f"Subsequent runs will trade within this allocation."
@@ -187,6 +232,47 @@ def _log_and_print(
     memory.log(msg, wallet_address=ctx.wallet_address, agent_name=agent_name)
 
 
+def _fetch_swap_preflight(
+    w3: Web3, token_in: str, wallet: str, router_address: str
+) -> Tuple[int, int, Dict[str, int]]:
+    """
+    Read (allowance, pending nonce, EIP-1559 fee params) ahead of a swap.
+
+    The three reads are independent, so they are sent as a single JSON-RPC
+    batch. Providers that reject batch requests fall back to issuing the same
+    calls concurrently; transport errors (HTTP 429/5xx, timeouts) propagate so
+    a throttled endpoint is not hit with three more requests.
+    """
+    allowance_call: TxParams = {
+        "to": token_in,
+        "data": erc20_allowance_calldata(wallet, router_address),
+    }
+    try:
+        with w3.batch_requests() as batch:
+            batch.add(w3.eth.call(allowance_call))
+            batch.add(w3.eth.get_transaction_count(wallet, "pending"))
+            batch.add(w3.eth.fee_history(FEE_HISTORY_BLOCKS, "latest", [50]))
+            allowance_data, nonce, fee_history = batch.execute()
+        return decode_uint256(allowance_data), nonce, eip1559_fee_params(fee_history)
+    except (Web3RPCError, BadResponseFormat):
+        # A provider without batch support answers with a single JSON-RPC
+        # error object (or a malformed body) instead of a list of responses.
+        pass
+
+    nonce_f = _RPC_EXECUTOR.submit(w3.eth.get_transaction_count, wallet, "pending")
+    fee_history_f = _RPC_EXECUTOR.submit(
+        w3.eth.fee_history, FEE_HISTORY_BLOCKS, "latest", [50]
+    )
+    # eth_call stays on this thread: web3 caches eth_chainId per thread, and
+    # the call would otherwise refetch it on a pool worker.
+    allowance = decode_uint256(w3.eth.call(allowance_call))
+    return (
+        allowance,
+        nonce_f.result(),
+        eip1559_fee_params(fee_history_f.result()),
+    )
+
+
 def _perform_swap(
     ctx: AgentContext,
     memory: MemoryService,
@@ -196,7 +282,7 @@ def _perform_swap(
     to_token_address: str,
     from_token_symbol: str,
     to_token_symbol: str,
-    amount_human: float,
+    amount_human: Decimal,
     amount_raw: int,
 ) -> bool:
     """
@@ -204,16 +290,12 @@ def _perform_swap(
 
     Aerodrome is the primary DEX on Base with deep liquidity for major pairs.
     """
-    from ..aerodrome import try_aerodrome_swap_simulation, build_aerodrome_swap_tx
-
     w3: Web3 = ctx.web3
     wallet = to_checksum(w3, ctx.wallet_address)
-    router_address = to_checksum(w3, AERODROME_ROUTER_ADDRESS)
+    router_address = AERODROME_ROUTER_ADDRESS
     token_in = to_checksum(w3, from_token_address)
     token_out = to_checksum(w3, to_token_address)
 
-    token_in_contract = w3.eth.contract(address=token_in, abi=ERC20_MINIMAL_ABI)
-
     # Log context
     _log_and_print(
         memory,
@@ -258,29 +340,20 @@ def _perform_swap(
 
     # 2) Check and handle allowance
     try:
-        allowance = token_in_contract.functions.allowance(wallet, router_address).call()
-    except Exception as exc:  # noqa: BLE001
-        _log_and_print(
-            memory,
-            ctx,
-            agent_name,
-            f"Error fetching allowance for {from_token_symbol}: {exc!r}. Aborting swap.",
+        allowance, nonce, fee_params = _fetch_swap_preflight(
+            w3, token_in, wallet, router_address
         )
-        return False
-
-    try:
-        nonce = w3.eth.get_transaction_count(wallet, "pending")
     except Exception as exc:  # noqa: BLE001
         _log_and_print(
             memory,
             ctx,
             agent_name,
-            f"Error fetching nonce for wallet {wallet}: {exc!r}. Aborting swap.",
+            f"Error fetching allowance/nonce/fees for {from_token_symbol} "
+            f"from wallet {wallet}: {exc!r}. Aborting swap.",
         )
         return False
 
-    gas_price = w3.eth.gas_price
-
+    approve_hash = None
     if allowance < amount_raw:
         _log_and_print(
             memory,
@@ -290,28 +363,18 @@ def _perform_swap(
             f"needs to be at least {amount_raw}. Sending approval transaction...",
         )
         try:
-            approve_tx = token_in_contract.functions.approve(
-                router_address, amount_raw
-            ).build_transaction(
-                {
-                    "from": wallet,
-                    "nonce": nonce,
-                    "gas": 200_000,
-                    "gasPrice": gas_price,
-                    "chainId": ctx.chain_id,
-                }
-            )
-            signed_approve = w3.eth.account.sign_transaction(
-                approve_tx, private_key=ctx.private_key
-            )
+            approve_tx: TxParams = {
+                "from": wallet,
+                "to": token_in,
+                "value": 0,
+                "data": encode_erc20_approve(router_address, amount_raw),
+                "nonce": nonce,
+                "chainId": ctx.chain_id,
+                **fee_params,
+            }
+            approve_tx["gas"] = estimate_gas_limit(w3, approve_tx, APPROVE_GAS_LIMIT)
+            signed_approve = ctx.sign_transaction(approve_tx)
             approve_hash = w3.eth.send_raw_transaction(signed_approve.raw_transaction)
-            _log_and_print(
-                memory,
-                ctx,
-                agent_name,
-                f"Sent approve tx: {approve_hash.hex()}. Waiting for confirmation...",
-            )
-            approve_receipt = w3.eth.wait_for_transaction_receipt(approve_hash)
         except Exception as exc:  # noqa: BLE001
             _log_and_print(
                 memory,
@@ -321,40 +384,14 @@ def _perform_swap(
             )
             return False
 
-        if approve_receipt.status != 1:
-            _log_and_print(
-                memory,
-                ctx,
-                agent_name,
-                f"Approval transaction reverted (status={approve_receipt.status}). Aborting swap.",
-            )
-            return False
-
-        # Log approval success with BaseScan URL
-        approve_hash_hex = approve_hash.hex() if hasattr(approve_hash, 'hex') else str(approve_hash)
-        if not approve_hash_hex.startswith('0x'):
-            approve_hash_hex = f'0x{approve_hash_hex}'
-        approve_url = f"https://basescan.org/tx/{approve_hash_hex}"
-        
         _log_and_print(
             memory,
             ctx,
             agent_name,
-            f"Approval confirmed in block {approve_receipt.blockNumber}. "
-            f"View on BaseScan: {approve_url}. Proceeding to swap...",
+            f"Sent approve tx: {approve_hash.hex()}. Waiting for confirmation...",
         )
-
-        # Refresh nonce after approval
-        try:
-            nonce = w3.eth.get_transaction_count(wallet, "pending")
-        except Exception as exc:  # noqa: BLE001
-            _log_and_print(
-                memory,
-                ctx,
-                agent_name,
-                f"Error refreshing nonce after approval: {exc!r}. Aborting swap.",
-            )
-            return False
+        # The swap takes the next nonce, right behind the approval.
+        nonce += 1
 
     # 3) Execute the swap
     deadline = int(time.time()) + 900  # 15 minutes
@@ -369,13 +406,110 @@ def _perform_swap(
             routes,
             deadline,  # 0 for amountOutMin (no slippage protection for now)
             nonce,
-            gas_price,
+            fee_params,
             ctx.chain_id,
         )
-        signed_swap = w3.eth.account.sign_transaction(
-            swap_tx, private_key=ctx.private_key
+        signed_swap = ctx.sign_transaction(swap_tx)
+    except Exception as exc:  # noqa: BLE001
+        _log_and_print(
+            memory,
+            ctx,
+            agent_name,
+            f"Swap transaction failed: {exc!r}.",
         )
-        swap_hash = w3.eth.send_raw_transaction(signed_swap.raw_transaction)
+        return False
+
+    swap_hash = None
+    if approve_hash is not None:
+        # Broadcast the swap without waiting for the approval to be mined; the
+        # sequencer orders both by nonce, so they usually land in one block.
+        # If the node refuses a transaction queued behind a pending one, the
+        # swap is sent again below once the approval has confirmed.
+        try:
+            swap_hash = w3.eth.send_raw_transaction(signed_swap.raw_transaction)
+        except (Web3RPCError, ValueError) as exc:
+            # The node answered and rejected the swap; record why.
+            _log_and_print(
+                memory,
+                ctx,
+                agent_name,
+                f"Node did not accept the swap ahead of the approval: {exc!r}. "
+                f"Will resend it once the approval confirms.",
+            )
+        except Exception as exc:  # noqa: BLE001
+            # Transport failure: the request may or may not have reached the
+            # node, so do not blindly resend it later.
+            _log_and_print(
+                memory,
+                ctx,
+                agent_name,
+                f"Could not broadcast swap tx: {exc!r}. Approval tx "
+                f"{approve_hash.hex()} is still pending. Aborting swap.",
+            )
+            return False
+
+        # Once the swap is out, it is no longer ours to abort: if the approval
+        # times out or reverts, report the swap's own outcome instead.
+        approve_problem = None
+        try:
+            approve_receipt = w3.eth.wait_for_transaction_receipt(
+                approve_hash,
+                timeout=RECEIPT_TIMEOUT_SECONDS,
+                poll_latency=RECEIPT_POLL_LATENCY_SECONDS,
+            )
+        except Exception as exc:  # noqa: BLE001
+            if swap_hash is None:
+                _log_and_print(
+                    memory,
+                    ctx,
+                    agent_name,
+                    f"Approval transaction failed: {exc!r}. Aborting swap.",
+                )
+                return False
+            approve_problem = (
+                f"Approval transaction not confirmed: {exc!r}. "
+                f"Swap tx {swap_hash.hex()} was already broadcast and may still execute"
+            )
+        else:
+            if approve_receipt.status != 1:
+                if swap_hash is None:
+                    _log_and_print(
+                        memory,
+                        ctx,
+                        agent_name,
+                        f"Approval transaction reverted (status={approve_receipt.status}). Aborting swap.",
+                    )
+                    return False
+                approve_problem = (
+                    f"Approval transaction reverted (status={approve_receipt.status}). "
+                    f"Swap tx {swap_hash.hex()} was already broadcast and will revert"
+                )
+
+        if approve_problem is not None:
+            _log_and_print(
+                memory,
+                ctx,
+                agent_name,
+                f"{approve_problem}; waiting for its receipt...",
+            )
+        else:
+            # Log approval success with BaseScan URL
+            approve_hash_hex = approve_hash.hex() if hasattr(approve_hash, 'hex') else str(approve_hash)
+            if not approve_hash_hex.startswith('0x'):
+                approve_hash_hex = f'0x{approve_hash_hex}'
+            approve_url = f"https://basescan.org/tx/{approve_hash_hex}"
+
+            _log_and_print(
+                memory,
+                ctx,
+                agent_name,
+                f"Approval confirmed in block {approve_receipt.blockNumber}. "
+                f"View on BaseScan: {approve_url}. Proceeding to swap...",
+            )
+
+    try:
+        if swap_hash is None:
+            swap_hash = w3.eth.send_raw_transaction(signed_swap.raw_transaction)
         _log_and_print(
             memory,
             ctx,
@@ -384,7 +518,20 @@ def _perform_swap(
             f"({amount_human} {from_token_symbol} -> {to_token_symbol}). "
             f"Waiting for confirmation...",
         )
-        swap_receipt = w3.eth.wait_for_transaction_receipt(swap_hash)
+        swap_receipt = w3.eth.wait_for_transaction_receipt(
+            swap_hash,
+            timeout=RECEIPT_TIMEOUT_SECONDS,
+            poll_latency=RECEIPT_POLL_LATENCY_SECONDS,
+        )
+    except TimeExhausted:
+        _log_and_print(
+            memory,
+            ctx,
+            agent_name,
+            f"Swap tx {swap_hash.hex()} not confirmed within "
+            f"{RECEIPT_TIMEOUT_SECONDS}s; it is still pending and may execute later.",
+        )
+        return False
     except Exception as exc:  # noqa: BLE001
         _log_and_print(
             memory,
@@ -431,8 +578,6 @@ def run_update_generic(
     """
     Shared update logic for SentiChain agents.
     """
-    from ..auth import load_auth_config
-
     memory = ctx.memory
 
     # Resolve API key from argument or local auth config.
@@ -494,11 +639,8 @@ def run_update_generic(
 
     # Reconcile stored position with on-chain balances.
     try:
-        usdc_human, usdc_raw, _ = get_erc20_balance(
-            w3, USDC_ADDRESS, ctx.wallet_address
-        )
-        quote_human, quote_raw, _ = get_erc20_balance(
-            w3, quote_token, ctx.wallet_address
+        (usdc_human, usdc_raw, usdc_info), (quote_human, quote_raw, quote_info) = (
+            get_erc20_balances(w3, [USDC_ADDRESS, quote_token], ctx.wallet_address)
         )
     except HTTPError as exc:
         _log_and_print(
@@ -547,7 +689,7 @@ def run_update_generic(
             _log_and_print(memory, ctx, agent_name, msg)
 
             usdc_human, usdc_raw, usdc_info = get_erc20_balance(
-                w3, USDC_ADDRESS, ctx.wallet_address
+                w3, USDC_ADDRESS, ctx.wallet_address, info=usdc_info
             )
             amount_raw = min(usdc_raw, pos.allocated_amount_raw)
             if amount_raw <= 0:
@@ -558,7 +700,7 @@ def run_update_generic(
                     f"USDC balance is {usdc_human} {usdc_info.symbol}, nothing to swap.",
                 )
                 return
-            amount_human = float(Decimal(amount_raw) / Decimal(10**usdc_info.decimals))
+            amount_human = to_human_amount(amount_raw, usdc_info.decimals)
 
             ok = _perform_swap(
                 ctx,
@@ -595,7 +737,7 @@ def run_update_generic(
             _log_and_print(memory, ctx, agent_name, msg)
 
             quote_human, quote_raw, quote_info = get_erc20_balance(
-                w3, quote_token, ctx.wallet_address
+                w3, quote_token, ctx.wallet_address, info=quote_info
             )
             if quote_raw <= 0:
                 _log_and_print(
@@ -607,7 +749,7 @@ def run_update_generic(
                 return
 
             amount_raw = quote_raw
-            amount_human = float(quote_human)
+            amount_human = quote_human
 
             ok = _perform_swap(
                 ctx,
@@ -705,7 +847,7 @@ def run_unwind_generic(
         to_token_address=USDC_ADDRESS,
         from_token_symbol=quote_symbol,
         to_token_symbol="USDC",
-        amount_human=float(quote_human),
+        amount_human=quote_human,
         amount_raw=quote_raw,
     )
     if ok:
@@ -13,7 +13,7 @@ from .auth import (
     save_premium_base_rpc_url,
     save_sentichain_api_key,
 )
-from .config import BASE_CHAIN_ID
+from .config import BASE_CHAIN_ID, BASE_RPC_URL
 from .memory import MemoryService
 from .wallets import WalletStore
 from .web3_utils import get_web3
@@ -191,6 +191,7 @@ def _build_agent_context(wallet_store: WalletStore, wallet_index: int) -> AgentC
         memory=mem,
         print=_printer,
         chain_id=BASE_CHAIN_ID,
+        account=wallet_store.get_account(wallet_index),
     )
 
 
@@ -210,21 +211,23 @@ def _agent_interactive_menu() -> None:
         f"\nUsing agent '{agent_name}' with wallet {ctx.wallet_address} on chain {ctx.chain_id}."
     )
 
-    while True:
-        typer.echo("\n=== Agent management ===")
-        typer.echo("1) Update agent (run once)")
-        typer.echo("2) Unwind agent (return to USDC)")
-        typer.echo("q) Quit")
-        choice = typer.prompt("Select an option", default="q").strip().lower()
-
-        if choice == "1":
-            agent_mod.run_update(ctx)
-        elif choice == "2":
-            agent_mod.run_unwind(ctx)
-        elif choice in {"q", "quit", "exit"}:
-            break
-        else:
-            typer.echo("Unknown option.")
+    # Close the memory DB connections however the menu is left.
+    with ctx.memory:
+        while True:
+            typer.echo("\n=== Agent management ===")
+            typer.echo("1) Update agent (run once)")
+            typer.echo("2) Unwind agent (return to USDC)")
+            typer.echo("q) Quit")
+            choice = typer.prompt("Select an option", default="q").strip().lower()
+
+            if choice == "1":
+                agent_mod.run_update(ctx)
+            elif choice == "2":
+                agent_mod.run_unwind(ctx)
+            elif choice in {"q", "quit", "exit"}:
+                break
+            else:
+                typer.echo("Unknown option.")
 
 
 # --------------------------------------------------------------------------- #
@@ -287,8 +290,6 @@ def _auth_interactive_menu() -> None:
                 clear_auth_config()
                 typer.echo("SentiChain API key and auth config deleted.")
         elif choice == "4":
-            from .config import BASE_RPC_URL
-
             if cfg and cfg.premium_base_rpc_url:
                 typer.echo(f"Premium Base RPC endpoint: {cfg.premium_base_rpc_url}")
             else:
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from eth_utils import to_checksum_address
+
 
 APP_NAME = "fundis"
 
@@ -24,14 +26,22 @@ MEMORY_DB_PATH: Path = DATA_DIR / "memory.db"
 BASE_CHAIN_ID: int = 8453
 BASE_RPC_URL: str = "https://mainnet.base.org"
 
-# Token addresses on Base (as plain strings; converted to checksum addresses by web3 helpers)
-USDC_ADDRESS = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"  # Native USDC on Base
-WBTC_ADDRESS = "0x0555E30da8f98308EdB960aa94C0Db47230d2B9c"
-WETH_ADDRESS = "0x4200000000000000000000000000000000000006"
+# Token addresses on Base, checksummed once at import so callers can pass
+# them straight to web3 without re-hashing.
+USDC_ADDRESS = to_checksum_address(
+    "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+)  # Native USDC on Base
+WBTC_ADDRESS = to_checksum_address("0x0555E30da8f98308EdB960aa94C0Db47230d2B9c")
+WETH_ADDRESS = to_checksum_address("0x4200000000000000000000000000000000000006")
 
 # Aerodrome Finance - Primary DEX on Base
 # Aerodrome is a fork of Velodrome with concentrated liquidity support
-AERODROME_ROUTER_ADDRESS = "0xcF77a3Ba9A5CA399B7c97c74d54e5b1Beb874E43"
+AERODROME_ROUTER_ADDRESS = to_checksum_address(
+    "0xcF77a3Ba9A5CA399B7c97c74d54e5b1Beb874E43"
+)
+
+# Multicall3 - same deployment address on every EVM chain, including Base
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
 
 
 def ensure_data_dir() -> None:
@@ -1,15 +1,76 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from .config import MEMORY_DB_PATH, ensure_data_dir
 
 
-@dataclass
+_UTC = timezone.utc
+_last_now_ms = -1
+_last_now_iso = ""
+
+
+def _now_iso() -> str:
+    """
+    Current UTC time in ISO-8601 format.
+
+    Writes landing in the same millisecond (e.g. a burst of log lines) share
+    one formatted timestamp instead of re-reading the clock and re-formatting.
+    """
+    global _last_now_ms, _last_now_iso
+    now_ms = time.time_ns() // 1_000_000
+    if now_ms != _last_now_ms:
+        _last_now_iso = datetime.now(_UTC).isoformat()
+        _last_now_ms = now_ms
+    return _last_now_iso
+
+
+# SQL for the hot paths lives at module level so the same string object is
+# passed on every call and hits sqlite3's per-connection statement cache.
+_SQL_INSERT_LOG = """
+    INSERT INTO logs (created_at, wallet_address, agent_name, level, message)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_GET_POSITION = """
+    SELECT wallet_address, agent_name, ticker, base_token, quote_token,
+           allocated_amount, allocated_amount_raw, current_position,
+           last_updated_at
+    FROM positions
+    WHERE wallet_address = ? AND agent_name = ?
+"""
+
+_SQL_UPSERT_POSITION = """
+    INSERT INTO positions (
+        wallet_address, agent_name, ticker, base_token, quote_token,
+        allocated_amount, allocated_amount_raw, current_position,
+        last_updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(wallet_address, agent_name) DO UPDATE SET
+        ticker = excluded.ticker,
+        base_token = excluded.base_token,
+        quote_token = excluded.quote_token,
+        allocated_amount = excluded.allocated_amount,
+        allocated_amount_raw = excluded.allocated_amount_raw,
+        current_position = excluded.current_position,
+        last_updated_at = excluded.last_updated_at
+"""
+
+_SQL_UPDATE_SIDE = """
+    UPDATE positions
+    SET current_position = ?, last_updated_at = ?
+    WHERE wallet_address = ? AND agent_name = ?
+"""
+
+
+@dataclass(slots=True, frozen=True)
 class Position:
     wallet_address: str
     agent_name: str
@@ -25,20 +86,96 @@ class Position:
 class MemoryService:
     """
     Simple SQLite-backed memory for agents.
+
+    Each thread using the service gets its own connection to the (WAL-mode)
+    database, so concurrent readers do not contend on a single connection.
+    An in-memory database instead uses one connection guarded by a lock.
     """
 
-    def __init__(self, db_path: Path | None = None) -> None:
+    def __init__(self, db_path: Path | str | None = None) -> None:
+        """
+        Pass ``db_path=":memory:"`` for a throwaway in-RAM database (e.g. in
+        tests). It is shared by all threads of this instance and discarded
+        on close().
+        """
         ensure_data_dir()
         self.db_path = db_path or MEMORY_DB_PATH
-        self._conn = sqlite3.connect(self.db_path)
-        self._conn.row_factory = sqlite3.Row
+        self._database = str(self.db_path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        # An in-memory database lives inside a single connection. Sharing it
+        # through shared-cache mode would bring table locks that ignore
+        # busy_timeout, so every thread uses the one connection instead and
+        # each operation (a whole batch() included) holds the lock.
+        self._memory_conn: Optional[sqlite3.Connection] = None
+        self._memory_lock: Optional[threading.RLock] = None
+        if self._database == ":memory:":
+            self._memory_lock = threading.RLock()
+            self._memory_conn = self._connect()
         self._init_schema()
 
+    # ------------------------------------------------------------------ #
+    # Connections
+    # ------------------------------------------------------------------ #
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = self._memory_conn or getattr(self._local, "conn", None)
+        if conn is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None puts the connection in autocommit mode: single
+        # statements commit on their own and batch() issues BEGIN/COMMIT itself,
+        # instead of the sqlite3 module inserting implicit BEGINs before DML.
+        conn = sqlite3.connect(
+            self._database,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        self._apply_pragmas(conn)
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _locked(self) -> Iterator[sqlite3.Connection]:
+        """Yield the connection to use, holding the lock for an in-memory DB."""
+        if self._memory_lock is None:
+            yield self._conn
+            return
+        with self._memory_lock:
+            yield self._conn
+
+    @staticmethod
+    def _apply_pragmas(conn: sqlite3.Connection) -> None:
+        # WAL lets readers run alongside the writer and, with synchronous=NORMAL,
+        # avoids an fsync on every commit. The DB lives under ~/.fundis, which
+        # is expected to be a local filesystem (WAL does not work over NFS).
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")  # ~20 MB
+        # Serve reads from a memory map instead of a pread() per page miss.
+        # The DB is small, so 256 MB is a ceiling rather than a reservation.
+        conn.execute("PRAGMA mmap_size=268435456")
+
     # ------------------------------------------------------------------ #
     # Schema
     # ------------------------------------------------------------------ #
     def _init_schema(self) -> None:
-        cur = self._conn.cursor()
+        with self.batch(), self._locked() as conn:
+            self._create_schema(conn.cursor())
+
+    @staticmethod
+    def _create_schema(cur: sqlite3.Cursor) -> None:
         cur.execute(
             """
             CREATE TABLE IF NOT EXISTS positions (
@@ -68,7 +205,50 @@ class MemoryService:
             )
             """
         )
-        self._conn.commit()
+        # positions lookups are served by the UNIQUE(wallet_address, agent_name)
+        # index. logs only grow; a single index keeps per-wallet time-range
+        # reads off a full scan without taxing every log insert further.
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_logs_wallet_time
+            ON logs(wallet_address, created_at)
+            """
+        )
+
+    # ------------------------------------------------------------------ #
+    # Transactions
+    # ------------------------------------------------------------------ #
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Group several writes into a single transaction.
+
+        Outside a batch every write autocommits on its own. Inside the block,
+        writes share one transaction that is committed on exit, or rolled back
+        if the block raises. Nested calls join the outer batch.
+        """
+        if self._in_batch:
+            yield
+            return
+        with self._locked() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.in_batch = True
+            try:
+                yield
+                conn.execute("COMMIT")
+            except BaseException:
+                # Also reached when COMMIT itself fails (e.g. SQLITE_BUSY), which
+                # leaves the transaction open; SQLite may already have rolled back.
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._local.in_batch = False
+
+    @property
+    def _in_batch(self) -> bool:
+        # Batches are per thread, like the connection they run on.
+        return getattr(self._local, "in_batch", False)
 
     # ------------------------------------------------------------------ #
     # Logging
@@ -80,105 +260,124 @@ class MemoryService:
         wallet_address: str | None = None,
         agent_name: str | None = None,
     ) -> None:
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO logs (created_at, wallet_address, agent_name, level, message)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                datetime.now(timezone.utc).isoformat(),
-                wallet_address,
-                agent_name,
-                level,
-                message,
-            ),
-        )
-        self._conn.commit()
+        with self._locked() as conn:
+            conn.execute(
+                _SQL_INSERT_LOG,
+                (
+                    _now_iso(),
+                    wallet_address,
+                    agent_name,
+                    level,
+                    message,
+                ),
+            )
+
+    def log_many(
+        self,
+        entries: Iterable[Tuple[str, str, str | None, str | None]],
+    ) -> None:
+        """
+        Insert several log lines with one executemany in a single transaction.
+
+        Each entry is `(message, level, wallet_address, agent_name)`, the same
+        order as the arguments of `log`. All entries share one timestamp.
+        """
+        now = _now_iso()
+        rows = [
+            (now, wallet_address, agent_name, level, message)
+            for message, level, wallet_address, agent_name in entries
+        ]
+        with self.batch(), self._locked() as conn:
+            conn.executemany(_SQL_INSERT_LOG, rows)
 
     # ------------------------------------------------------------------ #
     # Positions
     # ------------------------------------------------------------------ #
     def get_position(self, wallet_address: str, agent_name: str) -> Optional[Position]:
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            SELECT wallet_address, agent_name, ticker, base_token, quote_token,
-                   allocated_amount, allocated_amount_raw, current_position,
-                   last_updated_at
-            FROM positions
-            WHERE wallet_address = ? AND agent_name = ?
-            """,
-            (wallet_address, agent_name),
-        )
-        row = cur.fetchone()
+        # A single lookup on the UNIQUE(wallet_address, agent_name) index;
+        # always read from the DB, which other processes may also write.
+        with self._locked() as conn:
+            row = conn.execute(
+                _SQL_GET_POSITION, (wallet_address, agent_name)
+            ).fetchone()
         if not row:
             return None
-        return Position(
-            wallet_address=row["wallet_address"],
-            agent_name=row["agent_name"],
-            ticker=row["ticker"],
-            base_token=row["base_token"],
-            quote_token=row["quote_token"],
-            allocated_amount=row["allocated_amount"],
-            allocated_amount_raw=row["allocated_amount_raw"],
-            current_position=row["current_position"],
-            last_updated_at=row["last_updated_at"],
+        # Column order in _SQL_GET_POSITION matches the Position fields.
+        return Position(*row)
+
+    @staticmethod
+    def _position_params(position: Position) -> tuple:
+        return (
+            position.wallet_address,
+            position.agent_name,
+            position.ticker,
+            position.base_token,
+            position.quote_token,
+            position.allocated_amount,
+            position.allocated_amount_raw,
+            position.current_position,
+            position.last_updated_at,
         )
 
     def upsert_position(self, position: Position) -> None:
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO positions (
-                wallet_address, agent_name, ticker, base_token, quote_token,
-                allocated_amount, allocated_amount_raw, current_position,
-                last_updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(wallet_address, agent_name) DO UPDATE SET
-                ticker = excluded.ticker,
-                base_token = excluded.base_token,
-                quote_token = excluded.quote_token,
-                allocated_amount = excluded.allocated_amount,
-                allocated_amount_raw = excluded.allocated_amount_raw,
-                current_position = excluded.current_position,
-                last_updated_at = excluded.last_updated_at
-            """,
-            (
-                position.wallet_address,
-                position.agent_name,
-                position.ticker,
-                position.base_token,
-                position.quote_token,
-                position.allocated_amount,
-                position.allocated_amount_raw,
-                position.current_position,
-                position.last_updated_at,
-            ),
-        )
-        self._conn.commit()
+        with self._locked() as conn:
+            conn.execute(_SQL_UPSERT_POSITION, self._position_params(position))
+
+    def upsert_positions(self, positions: Sequence[Position]) -> None:
+        """Insert or update several positions with one executemany in one transaction."""
+        with self.batch(), self._locked() as conn:
+            conn.executemany(
+                _SQL_UPSERT_POSITION, [self._position_params(p) for p in positions]
+            )
 
     def update_position_side(
         self,
         wallet_address: str,
         agent_name: str,
         new_side: str,
-    ) -> None:
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            UPDATE positions
-            SET current_position = ?, last_updated_at = ?
-            WHERE wallet_address = ? AND agent_name = ?
-            """,
-            (
-                new_side,
-                datetime.now(timezone.utc).isoformat(),
-                wallet_address,
-                agent_name,
-            ),
-        )
-        self._conn.commit()
+    ) -> Optional[str]:
+        """
+        Update the stored side of a position.
+
+        Returns the new ``last_updated_at`` timestamp, or None if no position
+        exists for (wallet, agent).
+        """
+        # Plain UPDATE + rowcount rather than RETURNING, which needs
+        # SQLite >= 3.35 (older system libraries are still common).
+        now = _now_iso()
+        with self._locked() as conn:
+            cur = conn.execute(
+                _SQL_UPDATE_SIDE,
+                (
+                    new_side,
+                    now,
+                    wallet_address,
+                    agent_name,
+                ),
+            )
+        return now if cur.rowcount > 0 else None
 
     def close(self) -> None:
-        self._conn.close()
+        """
+        Close the connections opened by every thread that used the service.
+
+        Further use of the service raises ``sqlite3.ProgrammingError``.
+        """
+        with self._connections_lock:
+            self._closed = True
+            self._memory_conn = None
+            connections, self._connections = self._connections, []
+        own = getattr(self._local, "conn", None)
+        if own is not None and own in connections:
+            # Let SQLite refresh query planner statistics before disconnecting,
+            # on this thread's connection rather than one another thread may be
+            # using.
+            own.execute("PRAGMA optimize")
+        for conn in connections:
+            conn.close()
+
+    def __enter__(self) -> MemoryService:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
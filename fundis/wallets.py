@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import json
+import os
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from eth_account import Account
+from eth_account.signers.local import LocalAccount
 
 from .config import WALLET_STORE_PATH, ensure_data_dir
 
@@ -31,6 +34,11 @@ class WalletStore:
         ensure_data_dir()
         self.path = path or WALLET_STORE_PATH
         self._wallets: List[Wallet] = []
+        self._in_transaction = False
+        self._dirty = False
+        # Derived accounts keyed by address; key derivation (secp256k1 +
+        # keccak) is the expensive part of loading a signer.
+        self._accounts: Dict[str, LocalAccount] = {}
         self._load()
 
     # --------------------------------------------------------------------- #
@@ -63,7 +71,59 @@ class WalletStore:
                 for w in self._wallets
             ]
         }
-        self.path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        # Write to a sibling temp file and rename it over the store, so a crash
+        # mid-write leaves the previous file intact instead of a truncated one.
+        # The file holds private keys: keep the store's existing permissions
+        # (owner-only for a new store) and fsync before the rename so a power
+        # loss cannot leave an empty file in place of the old one.
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            mode = self.path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o600
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(payload, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        # os.open honours the umask and ignores the mode for a leftover temp
+        # file, so set it explicitly.
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if not self._in_transaction:
+            self._save()
+
+    # --------------------------------------------------------------------- #
+    # Transactions
+    # --------------------------------------------------------------------- #
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Defer saving until the block exits, so several mutations (e.g.
+        importing many wallets) rewrite the file once instead of once each.
+
+        If the block raises, in-memory changes are discarded by reloading the
+        file. Nested calls join the outer transaction.
+        """
+        if self._in_transaction:
+            yield
+            return
+        self._in_transaction = True
+        try:
+            yield
+        except BaseException:
+            self._dirty = False
+            self._load()
+            raise
+        else:
+            if self._dirty:
+                self._save()
+        finally:
+            self._in_transaction = False
 
     # --------------------------------------------------------------------- #
     # Public API
@@ -87,16 +147,27 @@ class WalletStore:
             created_at=datetime.now(timezone.utc).isoformat(),
         )
         self._wallets.append(wallet)
-        self._save()
+        self._accounts[address] = acct
+        self._mark_dirty()
         return wallet
 
     def delete_wallet(self, index: int) -> Wallet:
         wallet = self._wallets.pop(index)
-        self._save()
+        self._accounts.pop(wallet.address, None)
+        self._mark_dirty()
         return wallet
 
     def get_wallet(self, index: int) -> Wallet:
         return self._wallets[index]
 
+    def get_account(self, index: int) -> LocalAccount:
+        """Signing account for a wallet, derived from its key once and cached."""
+        wallet = self._wallets[index]
+        acct = self._accounts.get(wallet.address)
+        if acct is None:
+            acct = Account.from_key(wallet.private_key)
+            self._accounts[wallet.address] = acct
+        return acct
+
     def export_private_key(self, index: int) -> str:
         return self._wallets[index].private_key
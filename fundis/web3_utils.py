@@ -2,16 +2,49 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 import time
 
+import requests
+from eth_abi import decode as abi_decode
+from eth_abi import encode as abi_encode
+from requests.adapters import HTTPAdapter
 from web3 import Web3
+from web3.contract import Contract
 from web3.middleware import ExtraDataToPOAMiddleware
+from web3.providers.rpc.utils import (
+    REQUEST_RETRY_ALLOWLIST,
+    ExceptionRetryConfiguration,
+)
+from web3.types import FeeHistory, RPCEndpoint, TxParams
 
-from .config import BASE_RPC_URL
+from .config import (
+    BASE_RPC_URL,
+    MULTICALL3_ADDRESS,
+    USDC_ADDRESS,
+    WBTC_ADDRESS,
+    WETH_ADDRESS,
+)
 
 
 PUBLIC_RPC_THROTTLE_SECONDS = 0.5
+# Per-request HTTP timeout for JSON-RPC calls, so a stalled endpoint fails
+# fast instead of hanging an agent run.
+RPC_REQUEST_TIMEOUT_SECONDS = 30
+
+# Number of recent blocks sampled (at the 50th reward percentile) when
+# picking an EIP-1559 priority fee.
+FEE_HISTORY_BLOCKS = 4
+# Floor for the priority fee, so near-empty blocks do not yield a zero tip.
+MIN_PRIORITY_FEE_WEI = 1_000_000  # 0.001 gwei
+# Headroom added on top of eth_estimateGas when setting a gas limit.
+GAS_ESTIMATE_HEADROOM_PERCENT = 15
+
+# Receipt polling: Base produces a block every ~2s, so polling faster than
+# once a second only adds eth_getTransactionReceipt traffic.
+RECEIPT_TIMEOUT_SECONDS = 120
+RECEIPT_POLL_LATENCY_SECONDS = 1.0
 
 
 ERC20_MINIMAL_ABI = [
@@ -59,6 +92,32 @@ ERC20_MINIMAL_ABI = [
 ]
 
 
+# 4-byte ERC20 selectors, used to encode hot calls without going through
+# the Contract/ContractFunction machinery.
+ERC20_APPROVE_SELECTOR = bytes.fromhex("095ea7b3")  # approve(address,uint256)
+ERC20_BALANCE_OF_SELECTOR = bytes.fromhex("70a08231")  # balanceOf(address)
+ERC20_ALLOWANCE_SELECTOR = bytes.fromhex("dd62ed3e")  # allowance(address,address)
+ERC20_DECIMALS_SELECTOR = bytes.fromhex("313ce567")  # decimals()
+# 4-byte selector for Multicall3 aggregate3((address,bool,bytes)[]).
+MULTICALL3_AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+
+
+# Decimal(10**d) for every realistic ERC20 `decimals` value, so raw <-> human
+# amount conversions do not rebuild the scale on each call.
+_DECIMAL_SCALES: Dict[int, Decimal] = {d: Decimal(10**d) for d in range(31)}
+
+
+def decimal_scale(decimals: int) -> Decimal:
+    """Return Decimal(10**decimals), from the precomputed table when possible."""
+    scale = _DECIMAL_SCALES.get(decimals)
+    return scale if scale is not None else Decimal(10**decimals)
+
+
+def to_human_amount(raw: int, decimals: int) -> Decimal:
+    """Convert a raw token amount (smallest units) to a human-readable Decimal."""
+    return Decimal(raw) / decimal_scale(decimals)
+
+
 @dataclass
 class TokenInfo:
     address: str
@@ -66,9 +125,28 @@ class TokenInfo:
     symbol: str
 
 
+# decimals() and symbol() are immutable for a deployed token, so they are
+# fetched once per (rpc_url, token) and reused for the life of the process.
+_TOKEN_INFO_CACHE: Dict[Tuple[str, str], TokenInfo] = {}
+
+# Metadata for the tokens the bundled agents trade, keyed by checksum address,
+# so they never need a decimals()/symbol() lookup at all.
+_KNOWN_TOKENS: Dict[str, TokenInfo] = {
+    info.address: info
+    for info in (
+        TokenInfo(USDC_ADDRESS, 6, "USDC"),
+        TokenInfo(WETH_ADDRESS, 18, "WETH"),
+        TokenInfo(WBTC_ADDRESS, 8, "WBTC"),
+    )
+}
+
+
 def get_web3() -> Web3:
     """
     Build a Web3 instance configured for Base mainnet.
+
+    Instances are cached per RPC URL, so repeated calls share one HTTP
+    connection pool instead of paying a new TCP/TLS handshake each time.
     """
     # Determine RPC URL: prefer a premium endpoint from auth config, if present.
     rpc_url = BASE_RPC_URL
@@ -83,7 +161,48 @@ def get_web3() -> Web3:
         # Fall back to the public endpoint on any error.
         rpc_url = BASE_RPC_URL
 
-    provider = Web3.HTTPProvider(rpc_url)
+    return _build_web3(rpc_url)
+
+
+def _rpc_retry_configuration() -> ExceptionRetryConfiguration:
+    # Retries live in this one layer (the session adapter does none), so a
+    # throttled endpoint sees at most three attempts per call. Only connection
+    # failures and HTTP errors such as 429/503 are retried, not timeouts, and
+    # never eth_sendRawTransaction: a broadcast whose response was lost must
+    # not be repeated.
+    return ExceptionRetryConfiguration(
+        errors=(requests.ConnectionError, requests.HTTPError),
+        retries=3,
+        backoff_factor=0.2,
+        method_allowlist=[
+            m
+            for m in REQUEST_RETRY_ALLOWLIST
+            if m not in ("eth_sendRawTransaction", "eth_sign", "eth_signTypedData")
+        ],
+    )
+
+
+@lru_cache(maxsize=4)
+def _build_web3(rpc_url: str) -> Web3:
+    # web3 keys HTTP sessions by thread: this pooled session serves the thread
+    # that builds the instance, and other threads (e.g. executor workers) get
+    # web3's default session. Retries are configured on the provider, so they
+    # apply on every thread.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    # The chain id never changes for an endpoint; let the provider cache it
+    # instead of re-requesting eth_chainId before every eth_call.
+    provider = Web3.HTTPProvider(
+        rpc_url,
+        request_kwargs={"timeout": RPC_REQUEST_TIMEOUT_SECONDS},
+        session=session,
+        exception_retry_configuration=_rpc_retry_configuration(),
+        cache_allowed_requests=True,
+        cacheable_requests={RPCEndpoint("eth_chainId")},
+    )
     w3 = Web3(provider)
     # Attach metadata for downstream helpers (e.g. throttling).
     try:
@@ -97,33 +216,189 @@ def get_web3() -> Web3:
     return w3
 
 
-def to_checksum(w3: Web3, address: str) -> str:
-    return w3.to_checksum_address(address)
+def eip1559_fee_params(fee_history: FeeHistory) -> Dict[str, int]:
+    """
+    Build EIP-1559 fee fields from an `eth_feeHistory` response.
 
+    Expects a history requested with a single reward percentile, e.g.
+    `w3.eth.fee_history(FEE_HISTORY_BLOCKS, "latest", [50])`. The max fee
+    leaves room for the base fee to double before the transaction is included.
+    """
+    base_fee = fee_history["baseFeePerGas"][-1]
+    tips = sorted(reward[0] for reward in fee_history["reward"])
+    tip = tips[len(tips) // 2] if tips else 0
+    tip = max(tip, MIN_PRIORITY_FEE_WEI)
+    return {
+        "maxFeePerGas": 2 * base_fee + tip,
+        "maxPriorityFeePerGas": tip,
+    }
 
-def get_erc20_token_info(w3: Web3, token_address: str) -> TokenInfo:
-    contract = w3.eth.contract(
-        address=to_checksum(w3, token_address), abi=ERC20_MINIMAL_ABI
-    )
-    decimals = contract.functions.decimals().call()
-    symbol = contract.functions.symbol().call()
-    return TokenInfo(address=contract.address, decimals=decimals, symbol=symbol)
 
+def estimate_gas_limit(w3: Web3, tx: TxParams, fallback: int) -> int:
+    """
+    Gas limit for `tx` from `eth_estimateGas`, plus a safety margin.
 
-def get_erc20_balance(
-    w3: Web3, token_address: str, wallet_address: str
-) -> Tuple[Decimal, int, TokenInfo]:
+    Falls back to the given fixed limit if the estimate fails (e.g. the
+    provider rejects it or the call would revert at estimation time).
     """
-    Returns (human_amount, raw_amount, token_info).
+    params = {k: v for k, v in tx.items() if k != "gas"}
+    try:
+        estimate = w3.eth.estimate_gas(params)  # type: ignore[arg-type]
+    except Exception:  # noqa: BLE001
+        return fallback
+    return estimate * (100 + GAS_ESTIMATE_HEADROOM_PERCENT) // 100
+
+
+def encode_erc20_approve(spender: str, amount: int) -> bytes:
+    """
+    Calldata for `approve(spender, amount)`, encoded without going through
+    the Contract/ContractFunction machinery.
     """
+    return ERC20_APPROVE_SELECTOR + abi_encode(["address", "uint256"], [spender, amount])
+
+
+# Agents query the same few (owner[, spender]) pairs over and over, so the
+# encoded calldata is memoized rather than re-encoded on every read.
+@lru_cache(maxsize=256)
+def erc20_balance_of_calldata(owner: str) -> bytes:
+    """Calldata for `balanceOf(owner)`."""
+    return ERC20_BALANCE_OF_SELECTOR + abi_encode(["address"], [owner])
+
+
+@lru_cache(maxsize=256)
+def erc20_allowance_calldata(owner: str, spender: str) -> bytes:
+    """Calldata for `allowance(owner, spender)`."""
+    return ERC20_ALLOWANCE_SELECTOR + abi_encode(["address", "address"], [owner, spender])
+
+
+def decode_uint256(data: bytes) -> int:
+    """Decode a single ABI-encoded uint (e.g. a balanceOf/allowance result)."""
+    (value,) = abi_decode(["uint256"], data)
+    return value
+
+
+def multicall3_aggregate(
+    w3: Web3, calls: Sequence[Tuple[str, bytes]], allow_failure: bool = True
+) -> List[Tuple[bool, bytes]]:
+    """
+    Run several read-only calls in one `eth_call` through Multicall3.
+
+    `calls` is a sequence of (target_address, calldata). Returns one
+    (success, return_data) pair per call, in order. With `allow_failure`
+    False, any failing sub-call reverts the whole aggregate.
+    """
+    payload = abi_encode(
+        ["(address,bool,bytes)[]"],
+        [[(target, allow_failure, data) for target, data in calls]],
+    )
+    raw = w3.eth.call(
+        {
+            "to": MULTICALL3_ADDRESS,
+            "data": MULTICALL3_AGGREGATE3_SELECTOR + payload,
+        }
+    )
+    (results,) = abi_decode(["(bool,bytes)[]"], raw)
+    return [(bool(ok), bytes(data)) for ok, data in results]
+
+
+def _throttle_public_rpc(w3: Web3) -> None:
     # When using the public Base RPC, add a small delay to reduce the chance of
     # hitting rate limits (429 errors). Premium RPC endpoints are used as-is.
     is_public = getattr(w3, "_fundis_is_public_rpc", False)
     if is_public and PUBLIC_RPC_THROTTLE_SECONDS > 0:
         time.sleep(PUBLIC_RPC_THROTTLE_SECONDS)
 
-    info = get_erc20_token_info(w3, token_address)
-    contract = w3.eth.contract(address=info.address, abi=ERC20_MINIMAL_ABI)
-    raw = contract.functions.balanceOf(to_checksum(w3, wallet_address)).call()
-    human = Decimal(raw) / Decimal(10**info.decimals)
+
+@lru_cache(maxsize=1024)
+def _checksum_address(address: str) -> str:
+    return Web3.to_checksum_address(address)
+
+
+def to_checksum(w3: Web3, address: str) -> str:
+    # Checksumming hashes the address with keccak256; the same handful of
+    # wallet/token/router addresses is checksummed many times per run.
+    return _checksum_address(address)
+
+
+def get_erc20_contract(w3: Web3, token_address: str) -> Contract:
+    """ERC20 contract instance for a token (built once per Web3 instance and token)."""
+    address = to_checksum(w3, token_address)
+    contracts = getattr(w3, "_fundis_erc20_contracts", None)
+    if contracts is None:
+        contracts = {}
+        try:
+            w3._fundis_erc20_contracts = contracts  # type: ignore[attr-defined]
+        except Exception:  # noqa: BLE001
+            pass
+    contract = contracts.get(address)
+    if contract is None:
+        contract = w3.eth.contract(address=address, abi=ERC20_MINIMAL_ABI)
+        contracts[address] = contract
+    return contract
+
+
+def get_erc20_token_info(w3: Web3, token_address: str) -> TokenInfo:
+    address = to_checksum(w3, token_address)
+    known = _KNOWN_TOKENS.get(address)
+    if known is not None:
+        return known
+
+    cache_key = (getattr(w3, "_fundis_rpc_url", ""), address)
+    cached = _TOKEN_INFO_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Only a cache miss issues the decimals()/symbol() burst worth throttling.
+    _throttle_public_rpc(w3)
+    decimals = decode_uint256(
+        w3.eth.call({"to": address, "data": ERC20_DECIMALS_SELECTOR})
+    )
+    # symbol() returns a dynamic string; let the contract ABI decode it.
+    symbol = get_erc20_contract(w3, address).functions.symbol().call()
+    info = TokenInfo(address=address, decimals=decimals, symbol=symbol)
+    _TOKEN_INFO_CACHE[cache_key] = info
+    return info
+
+
+def get_erc20_balance(
+    w3: Web3,
+    token_address: str,
+    wallet_address: str,
+    info: Optional[TokenInfo] = None,
+) -> Tuple[Decimal, int, TokenInfo]:
+    """
+    Returns (human_amount, raw_amount, token_info).
+
+    Token metadata is cached, so after the first call per token this is a
+    single balanceOf request and no throttle delay. Callers that already hold
+    the token's TokenInfo can pass it as `info` to skip the lookup entirely.
+    """
+    if info is None:
+        info = get_erc20_token_info(w3, token_address)
+    calldata = erc20_balance_of_calldata(to_checksum(w3, wallet_address))
+    raw = decode_uint256(w3.eth.call({"to": info.address, "data": calldata}))
+    human = to_human_amount(raw, info.decimals)
     return human, raw, info
+
+
+def get_erc20_balances(
+    w3: Web3, token_addresses: Sequence[str], wallet_address: str
+) -> List[Tuple[Decimal, int, TokenInfo]]:
+    """
+    Like `get_erc20_balance` for several tokens at once.
+
+    All balanceOf reads go out as a single Multicall3 `eth_call`, so the
+    cost is one round-trip regardless of how many tokens are queried.
+    """
+    infos = [get_erc20_token_info(w3, token) for token in token_addresses]
+    balance_of = erc20_balance_of_calldata(to_checksum(w3, wallet_address))
+    results = multicall3_aggregate(
+        w3, [(info.address, balance_of) for info in infos], allow_failure=False
+    )
+
+    balances: List[Tuple[Decimal, int, TokenInfo]] = []
+    for info, (_, data) in zip(infos, results):
+        raw = decode_uint256(data)
+        human = to_human_amount(raw, info.decimals)
+        balances.append((human, raw, info))
+    return balances